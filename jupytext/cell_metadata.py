@@ -50,6 +50,8 @@ _IGNORE_CELL_METADATA = ','.join('-{}'.format(name) for name in [
                                  _JUPYTEXT_CELL_METADATA)
 
 _IDENTIFIER_RE = re.compile(r'^[a-zA-Z_\.]+[a-zA-Z0-9_\.]*$')
+_RMD_LANGUAGE_SEPARATOR_RE = re.compile(r'\s|,')
+_ACTIVE_SEPARATOR_RE = re.compile(r'\.|,')
 
 
 def _r_logical_values(pybool):
@@ -74,13 +76,16 @@ def _py_logical_values(rbool):
 
 def metadata_to_rmd_options(language, metadata, use_runtools=False):
     """Convert language and metadata information to their rmd representation"""
+    if not metadata:
+        # Most cells have no metadata
+        return (language or '').lower().strip(',').strip()
     options = (language or 'R').lower()
     if 'name' in metadata:
         options += ' ' + metadata['name'] + ','
         del metadata['name']
     if use_runtools:
         for rmd_option, jupyter_options in _RMARKDOWN_TO_RUNTOOLS_OPTION_MAP:
-            if all([metadata.get(opt_name) == opt_value for opt_name, opt_value in jupyter_options]):
+            if all(metadata.get(opt_name) == opt_value for opt_name, opt_value in jupyter_options):
                 options += ' {}={},'.format(rmd_option[0], 'FALSE' if rmd_option[1] is False else rmd_option[1])
                 for opt_name, _ in jupyter_options:
                     metadata.pop(opt_name)
@@ -232,7 +237,7 @@ def parse_rmd_options(line):
 
 def rmd_options_to_metadata(options, use_runtools=False):
     """Parse rmd options and return a metadata dictionary"""
-    options = re.split(r'\s|,', options, 1)
+    options = _RMD_LANGUAGE_SEPARATOR_RE.split(options, 1)
     if len(options) == 1:
         language = options[0]
         chunk_options = []
@@ -295,7 +300,7 @@ def is_active(ext, metadata, default=True):
             return ext.replace('.', '') in tag.split('-')
     if 'active' not in metadata:
         return default
-    return ext.replace('.', '') in re.split(r'\.|,', metadata['active'])
+    return ext.replace('.', '') in _ACTIVE_SEPARATOR_RE.split(metadata['active'])
 
 
 def metadata_to_double_percent_options(metadata, plain_json):
@@ -456,6 +461,10 @@ def metadata_to_text(language_or_title, metadata=None, plain_json=False):
     if metadata is None:
         metadata, language_or_title = language_or_title, metadata
 
+    if not metadata:
+        # Most cells have no metadata
+        return language_or_title or ''
+
     metadata = {key: metadata[key] for key in metadata if key not in _JUPYTEXT_CELL_METADATA}
     text = [language_or_title] if language_or_title else []
     if language_or_title is None:
@@ -2,7 +2,6 @@
 
 import re
 import warnings
-from copy import copy
 from .languages import cell_language, comment_lines, same_language
 from .cell_metadata import is_active, _IGNORE_CELL_METADATA
 from .cell_metadata import metadata_to_text, metadata_to_rmd_options, metadata_to_double_percent_options
@@ -12,6 +11,19 @@ from .cell_reader import LightScriptCellReader, MarkdownCellReader, RMarkdownCel
 from .languages import _SCRIPT_EXTENSIONS
 from .pep8 import pep8_lines_between_cells
 
+# Existing end-of-cell markers, e.g. '# -' or '# ---', for each comment string
+_ENDOFCELL_RE = {_SCRIPT_EXTENSIONS[ext]['comment']: re.compile(
+    r'^{} (-+)\s*$'.format(_SCRIPT_EXTENSIONS[ext]['comment'])) for ext in _SCRIPT_EXTENSIONS}
+
+# Blank lines and start of cell markers are the only lines at which
+# a light script cell without metadata can end
+_LIGHT_CELL_BOUNDARY_RE = {_SCRIPT_EXTENSIONS[ext]['comment']: re.compile(
+    r'^(\s*$|{}\s*\+)'.format(_SCRIPT_EXTENSIONS[ext]['comment']), re.MULTILINE) for ext in _SCRIPT_EXTENSIONS}
+
+# A line that does not start with the comment string
+_UNCOMMENTED_LINE_RE = {_SCRIPT_EXTENSIONS[ext]['comment']: re.compile(
+    r'^(?!{})'.format(_SCRIPT_EXTENSIONS[ext]['comment']), re.MULTILINE) for ext in _SCRIPT_EXTENSIONS}
+
 
 def cell_source(cell):
     """Return the source of the current cell, as an array of lines"""
@@ -24,17 +36,26 @@ def cell_source(cell):
 
 
 class BaseCellExporter(object):
-    """A class that represent a notebook cell as text"""
+    """A class that represent a notebook cell as text. The cell exporters
+    use __slots__, so the attributes of each exporter must be declared there"""
+    __slots__ = ('fmt', 'ext', 'cell_type', 'source', 'unfiltered_metadata', 'metadata', 'language',
+                 'default_language', 'comment', 'comment_magics', 'cell_metadata_json', 'use_runtools',
+                 'lines_to_next_cell', 'lines_to_end_of_cell_marker')
     default_comment_magics = None
     parse_cell_language = True
+    # Is the cell language stored in the cell metadata, or in the code chunk options?
+    language_in_metadata = True
+    # Should magics be escaped in the cells that we comment out?
+    comment_magics_in_commented_cells = True
 
     def __init__(self, cell, default_language, fmt=None):
         self.fmt = fmt or {}
         self.ext = self.fmt.get('extension')
         self.cell_type = cell.cell_type
         self.source = cell_source(cell)
-        self.unfiltered_metadata = cell.metadata
-        self.metadata = filter_metadata(cell.metadata,
+        # cell.metadata is resolved by NotebookNode.__getattr__, so we look it up only once
+        self.unfiltered_metadata = metadata = cell.metadata
+        self.metadata = filter_metadata(metadata,
                                         self.fmt.get('cell_metadata_filter'),
                                         _IGNORE_CELL_METADATA)
         if self.parse_cell_language:
@@ -45,10 +66,10 @@ class BaseCellExporter(object):
         else:
             self.language = None
 
-        if self.language and not self.ext.endswith('.Rmd'):
+        if self.language and self.language_in_metadata:
             self.metadata['language'] = self.language
 
-        self.language = self.language or cell.metadata.get('language', default_language)
+        self.language = self.language or metadata.get('language', default_language)
         self.default_language = default_language
         self.comment = _SCRIPT_EXTENSIONS.get(self.ext, {}).get('comment', '#')
         self.comment_magics = self.fmt.get('comment_magics', self.default_comment_magics)
@@ -56,10 +77,10 @@ class BaseCellExporter(object):
         self.use_runtools = self.fmt.get('use_runtools', False)
 
         # how many blank lines before next cell
-        self.lines_to_next_cell = cell.metadata.get('lines_to_next_cell')
-        self.lines_to_end_of_cell_marker = cell.metadata.get('lines_to_end_of_cell_marker')
+        self.lines_to_next_cell = metadata.get('lines_to_next_cell')
+        self.lines_to_end_of_cell_marker = metadata.get('lines_to_end_of_cell_marker')
 
-        if cell.cell_type == 'raw' and 'active' not in self.metadata and not any(
+        if self.cell_type == 'raw' and 'active' not in self.metadata and not any(
                 tag.startswith('active-') for tag in self.metadata.get('tags', [])):
             self.metadata['active'] = ''
 
@@ -93,8 +114,9 @@ class BaseCellExporter(object):
         if self.is_code():
             return self.code_to_text()
 
-        source = copy(self.source)
+        source = self.source
         if not self.comment:
+            source = source[:]
             escape_code_start(source, self.ext, None)
         return self.markdown_to_text(source)
 
@@ -108,14 +130,13 @@ class BaseCellExporter(object):
                 left = cell_markers + '\n'
                 right = '\n' + cell_markers
             if left[:3] == right[-3:] and left[:3] in ['"""', "'''"]:
-                source = copy(source)
+                source = source[:]
                 source[0] = left + source[0]
                 source[-1] = source[-1] + right
                 return source
 
-        if self.comment and self.comment != "#'" and is_active(self.ext, self.metadata) and \
-                self.fmt.get('format_name') not in ['percent', 'hydrogen']:
-            source = copy(source)
+        if self.comment and self.comment_magics_in_commented_cells and is_active(self.ext, self.metadata):
+            source = source[:]
             comment_magic(source, self.language, self.comment_magics, explicitly_code=self.cell_type == 'code')
 
         return comment_lines(source, self.comment)
@@ -132,6 +153,7 @@ class BaseCellExporter(object):
 
 class MarkdownCellExporter(BaseCellExporter):
     """A class that represent a notebook cell as Markdown"""
+    __slots__ = ()
     default_comment_magics = False
     cell_reader = MarkdownCellReader
 
@@ -167,7 +189,7 @@ class MarkdownCellExporter(BaseCellExporter):
 
     def code_to_text(self):
         """Return the text representation of a code cell"""
-        source = copy(self.source)
+        source = self.source[:]
         comment_magic(source, self.language, self.comment_magics)
 
         if self.metadata.get('active') == '':
@@ -183,8 +205,10 @@ class MarkdownCellExporter(BaseCellExporter):
 
 class RMarkdownCellExporter(MarkdownCellExporter):
     """A class that represent a notebook cell as R Markdown"""
+    __slots__ = ()
     default_comment_magics = True
     cell_reader = RMarkdownCellReader
+    language_in_metadata = False
 
     def __init__(self, *args, **kwargs):
         MarkdownCellExporter.__init__(self, *args, **kwargs)
@@ -194,48 +218,55 @@ class RMarkdownCellExporter(MarkdownCellExporter):
     def code_to_text(self):
         """Return the text representation of a code cell"""
         active = is_active(self.ext, self.metadata)
-        source = copy(self.source)
+        source = self.source
 
         if active:
+            source = source[:]
             comment_magic(source, self.language, self.comment_magics)
-
-        lines = []
-        if not is_active(self.ext, self.metadata):
+        else:
             self.metadata['eval'] = False
+
         options = metadata_to_rmd_options(self.language, self.metadata, self.use_runtools)
-        lines.append('```{{{}}}'.format(options))
-        lines.extend(source)
-        lines.append('```')
-        return lines
+        return ['```{{{}}}'.format(options)] + source + ['```']
 
 
 def endofcell_marker(source, comment):
     """Issues #31 #38:  does the cell contain a blank line? In that case
     we add an end-of-cell marker"""
+    endofcell_re = _ENDOFCELL_RE.get(comment) or re.compile(r'^{} (-+)\s*$'.format(comment))
+    existing = set()
+    for line in source:
+        match = endofcell_re.match(line)
+        if match:
+            existing.add(match.group(1))
     endofcell = '-'
-    while True:
-        endofcell_re = re.compile(r'^{}( )'.format(comment) + endofcell + r'\s*$')
-        if list(filter(endofcell_re.match, source)):
-            endofcell = endofcell + '-'
-        else:
-            return endofcell
+    while endofcell in existing:
+        endofcell = endofcell + '-'
+    return endofcell
 
 
 class LightScriptCellExporter(BaseCellExporter):
     """A class that represent a notebook cell as a Python or Julia script"""
+    __slots__ = ('cell_marker_start', 'cell_marker_end', 'start_code_re', 'end_code_re', 'cell_boundary_re')
     default_comment_magics = True
     use_cell_markers = True
-    cell_marker_start = None
-    cell_marker_end = None
 
     def __init__(self, *args, **kwargs):
         BaseCellExporter.__init__(self, *args, **kwargs)
+        self.cell_marker_start = None
+        self.cell_marker_end = None
         if 'cell_markers' in self.fmt:
             if ',' not in self.fmt['cell_markers']:
                 warnings.warn("Ignored cell markers '{}' as it does not match the expected 'start,end' pattern"
                               .format(self.fmt.pop('cell_markers')))
             elif self.fmt['cell_markers'] != '+,-':
                 self.cell_marker_start, self.cell_marker_end = self.fmt['cell_markers'].split(',', 1)
+                self.start_code_re = re.compile('^' + self.comment + r'\s*' + self.cell_marker_start + r'\s*(.*)$')
+                self.end_code_re = re.compile('^' + self.comment + r'\s*' + self.cell_marker_end + r'\s*$')
+                self.cell_boundary_re = re.compile(r'^(\s*$|{0}\s*{1}|{0}\s*{2}\s*$)'.format(
+                    self.comment, self.cell_marker_start, self.cell_marker_end), re.MULTILINE)
+        if not self.cell_marker_start:
+            self.cell_boundary_re = _LIGHT_CELL_BOUNDARY_RE[self.comment]
         for key in ['endofcell']:
             if key in self.unfiltered_metadata:
                 self.metadata[key] = self.unfiltered_metadata[key]
@@ -247,7 +278,7 @@ class LightScriptCellExporter(BaseCellExporter):
                 self.metadata['cell_type'] = self.cell_type
                 self.source = self.markdown_to_text(self.source)
                 self.cell_type = 'code'
-                self.unfiltered_metadata = copy(self.unfiltered_metadata)
+                self.unfiltered_metadata = dict(self.unfiltered_metadata)
                 self.unfiltered_metadata.pop('cell_marker', '')
             return True
         return super(LightScriptCellExporter, self).is_code()
@@ -255,7 +286,7 @@ class LightScriptCellExporter(BaseCellExporter):
     def code_to_text(self):
         """Return the text representation of a code cell"""
         active = is_active(self.ext, self.metadata, same_language(self.language, self.default_language))
-        source = copy(self.source)
+        source = self.source[:]
         escape_code_start(source, self.ext, self.language)
         comment_questions = self.metadata.pop('comment_questions', True)
 
@@ -271,7 +302,6 @@ class LightScriptCellExporter(BaseCellExporter):
         if not self.metadata or not self.use_cell_markers:
             return source
 
-        lines = []
         endofcell = self.metadata['endofcell']
         if endofcell == '-' or self.cell_marker_end:
             del self.metadata['endofcell']
@@ -280,10 +310,7 @@ class LightScriptCellExporter(BaseCellExporter):
         options = metadata_to_double_percent_options(self.metadata, self.cell_metadata_json)
         if options:
             cell_start.append(options)
-        lines.append(' '.join(cell_start))
-        lines.extend(source)
-        lines.append(self.comment + ' {}'.format(endofcell))
-        return lines
+        return [' '.join(cell_start)] + source + [self.comment + ' {}'.format(endofcell)]
 
     def explicit_start_marker(self, source):
         """Does the python representation of this cell requires an explicit
@@ -293,13 +320,14 @@ class LightScriptCellExporter(BaseCellExporter):
         if self.metadata:
             return True
         if self.cell_marker_start:
-            start_code_re = re.compile('^' + self.comment + r'\s*' + self.cell_marker_start + r'\s*(.*)$')
-            end_code_re = re.compile('^' + self.comment + r'\s*' + self.cell_marker_end + r'\s*$')
-            if start_code_re.match(source[0]) or end_code_re.match(source[0]):
+            if self.start_code_re.match(source[0]) or self.end_code_re.match(source[0]):
                 return False
 
-        if all([line.startswith(self.comment) for line in self.source]):
+        if not _UNCOMMENTED_LINE_RE[self.comment].search('\n'.join(self.source)):
             return True
+        # Cheap test before parsing the cell: can the cell end before its last line?
+        if not self.cell_boundary_re.search('\n'.join(source)):
+            return False
         if LightScriptCellReader(self.fmt).read(source)[1] < len(source):
             return True
 
@@ -333,12 +361,15 @@ class LightScriptCellExporter(BaseCellExporter):
 
 class BareScriptCellExporter(LightScriptCellExporter):
     """A class that writes notebook cells as scripts with no cell markers"""
+    __slots__ = ()
     use_cell_markers = False
 
 
 class RScriptCellExporter(BaseCellExporter):
     """A class that can represent a notebook cell as a R script"""
+    __slots__ = ()
     default_comment_magics = True
+    comment_magics_in_commented_cells = False
 
     def __init__(self, *args, **kwargs):
         BaseCellExporter.__init__(self, *args, **kwargs)
@@ -347,29 +378,27 @@ class RScriptCellExporter(BaseCellExporter):
     def code_to_text(self):
         """Return the text representation of a code cell"""
         active = is_active(self.ext, self.metadata)
-        source = copy(self.source)
+        source = self.source[:]
         escape_code_start(source, self.ext, self.language)
 
         if active:
             comment_magic(source, self.language, self.comment_magics)
-
-        if not active:
-            source = ['# ' + line if line else '#' for line in source]
-
-        lines = []
-        if not is_active(self.ext, self.metadata):
+        else:
+            source = comment_lines(source, '#')
             self.metadata['eval'] = False
+
         options = metadata_to_rmd_options(None, self.metadata, self.use_runtools)
         if options:
-            lines.append('#+ {}'.format(options))
-        lines.extend(source)
-        return lines
+            return ['#+ {}'.format(options)] + source
+        return source
 
 
 class DoublePercentCellExporter(BaseCellExporter):  # pylint: disable=W0223
     """A class that can represent a notebook cell as a Spyder/VScode script (#59)"""
+    __slots__ = ('cell_markers',)
     default_comment_magics = True
     parse_cell_language = True
+    comment_magics_in_commented_cells = False
 
     def __init__(self, *args, **kwargs):
         BaseCellExporter.__init__(self, *args, **kwargs)
@@ -391,7 +420,7 @@ class DoublePercentCellExporter(BaseCellExporter):  # pylint: disable=W0223
             lines = [self.comment + ' %% ' + options]
 
         if self.cell_type == 'code' and active:
-            source = copy(self.source)
+            source = self.source[:]
             comment_magic(source, self.language, self.comment_magics)
             if source == ['']:
                 return lines
@@ -402,6 +431,7 @@ class DoublePercentCellExporter(BaseCellExporter):  # pylint: disable=W0223
 
 class HydrogenCellExporter(DoublePercentCellExporter):  # pylint: disable=W0223
     """A class that can represent a notebook cell as a Hydrogen script (#59)"""
+    __slots__ = ()
     default_comment_magics = False
     parse_cell_language = False
 
@@ -409,6 +439,7 @@ class HydrogenCellExporter(DoublePercentCellExporter):  # pylint: disable=W0223
 class SphinxGalleryCellExporter(BaseCellExporter):  # pylint: disable=W0223
     """A class that can represent a notebook cell as a
     Sphinx Gallery script (#80)"""
+    __slots__ = ()
 
     default_cell_marker = '#' * 79
     default_comment_magics = True
@@ -428,7 +459,7 @@ class SphinxGalleryCellExporter(BaseCellExporter):  # pylint: disable=W0223
     def cell_to_text(self):
         """Return the text representation for the cell"""
         if self.cell_type == 'code':
-            source = copy(self.source)
+            source = self.source[:]
             return comment_magic(source, self.language, self.comment_magics)
 
         if 'cell_marker' in self.metadata:
@@ -5,6 +5,7 @@ import io
 import sys
 import logging
 import warnings
+from collections import deque
 from copy import copy, deepcopy
 from nbformat.v4.rwbase import NotebookReader, NotebookWriter
 from nbformat.v4.nbbase import new_notebook, new_code_cell, NotebookNode
@@ -147,8 +148,10 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
         header.extend(header_content)
 
         cell_exporters = []
-        looking_for_first_markdown_cell = (self.implementation.format_name and
-                                           self.implementation.format_name.startswith('sphinx'))
+        sphinx_format = bool(self.implementation.format_name and
+                             self.implementation.format_name.startswith('sphinx'))
+        markdown_format = self.ext in ['.md', '.markdown', '.Rmd']
+        looking_for_first_markdown_cell = sphinx_format
         split_at_heading = self.fmt.get('split_at_heading', False)
 
         for cell in nb.cells:
@@ -159,44 +162,45 @@ class TextNotebookConverter(NotebookReader, NotebookWriter):
             cell_exporters.append(self.implementation.cell_exporter_class(cell, default_language, self.fmt))
 
         texts = [cell.cell_to_text() for cell in cell_exporters]
-        lines = []
+        # The lines of the text representation are inserted at the left of a deque,
+        # so that adding a cell does not copy the lines of all the cells below
+        lines = deque()
 
         # concatenate cells in reverse order to determine how many blank lines (pep8)
         for i, cell in reversed(list(enumerate(cell_exporters))):
             text = cell.remove_eoc_marker(texts[i], lines)
 
-            if i == 0 and self.implementation.format_name and \
-                    self.implementation.format_name.startswith('sphinx') and \
-                    (text in [['%matplotlib inline'], ['# %matplotlib inline']]):
+            if i == 0 and sphinx_format and (text in [['%matplotlib inline'], ['# %matplotlib inline']]):
                 continue
 
             lines_to_next_cell = cell.lines_to_next_cell
             if lines_to_next_cell is None:
                 lines_to_next_cell = pep8_lines_between_cells(text, lines, self.implementation.extension)
 
-            text.extend([''] * lines_to_next_cell)
-
             # two blank lines between markdown cells in Rmd when those do not have explicit region markers
-            if self.ext in ['.md', '.markdown', '.Rmd'] and not cell.is_code():
+            if markdown_format and not cell.is_code():
                 if (i + 1 < len(cell_exporters) and not cell_exporters[i + 1].is_code() and
                         not texts[i][0].startswith('<!-- #') and
                         not texts[i + 1][0].startswith('<!-- #') and
                         (not split_at_heading or not (texts[i + 1] and texts[i + 1][0].startswith('#')))):
-                    text.append('')
+                    lines_to_next_cell += 1
 
             # "" between two consecutive code cells in sphinx
-            if self.implementation.format_name.startswith('sphinx') and cell.is_code():
+            if sphinx_format and cell.is_code():
                 if i + 1 < len(cell_exporters) and cell_exporters[i + 1].is_code():
-                    text.append('""')
+                    lines.appendleft('""')
 
-            lines = text + lines
+            # The cell text is not extended with the blank lines, as this would resize the list
+            lines.extendleft([''] * lines_to_next_cell)
+            lines.extendleft(reversed(text))
 
         if header_lines_to_next_cell is None:
             header_lines_to_next_cell = pep8_lines_between_cells(header_content, lines, self.implementation.extension)
 
         header.extend([''] * header_lines_to_next_cell)
+        header.extend(lines)
 
-        return '\n'.join(header + lines)
+        return '\n'.join(header)
 
 
 def reads(text, fmt, as_version=nbformat.NO_CONVERT, **kwargs):
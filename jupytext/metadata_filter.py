@@ -3,6 +3,11 @@
 from copy import copy
 from .cell_metadata import _JUPYTEXT_CELL_METADATA
 
+try:
+    unicode  # Python 2
+except NameError:
+    unicode = str  # Python 3
+
 _DEFAULT_NOTEBOOK_METADATA = ','.join([
     # Preserve Jupytext section
     'jupytext',
@@ -11,6 +16,9 @@ _DEFAULT_NOTEBOOK_METADATA = ','.join([
     # Kernel_info found in Nteract notebooks
     'kernel_info'])
 
+# Metadata filters that were already parsed by keep_only_and_exclude
+_KEEP_ONLY_AND_EXCLUDE = {}
+
 
 def metadata_filter_as_dict(metadata_config):
     """Return the metadata filter represented as either None (no filter),
@@ -107,6 +115,26 @@ def update_metadata_filters(metadata, jupyter_md, cell_metadata):
 
 def filter_metadata(metadata, user_filter, default_filter=''):
     """Filter the cell or notebook metadata, according to the user preference"""
+    if not (is_cacheable_filter(user_filter) and is_cacheable_filter(default_filter)):
+        keep_only, exclude = keep_only_and_exclude(user_filter, default_filter)
+    else:
+        # String filters are parsed only once (filter_metadata is called for every cell)
+        key = (user_filter, default_filter)
+        if key not in _KEEP_ONLY_AND_EXCLUDE:
+            _KEEP_ONLY_AND_EXCLUDE[key] = keep_only_and_exclude(user_filter, default_filter)
+        keep_only, exclude = _KEEP_ONLY_AND_EXCLUDE[key]
+
+    return subset_metadata(metadata, keep_only=keep_only, exclude=exclude)
+
+
+def is_cacheable_filter(metadata_filter):
+    """Can this metadata filter be used as a key for the cache of parsed filters?"""
+    return metadata_filter is None or isinstance(metadata_filter, (bool, str, unicode))
+
+
+def keep_only_and_exclude(user_filter, default_filter):
+    """Return the metadata to keep (None for all) and the metadata to exclude,
+    given the user and the default metadata filters"""
     default_filter = metadata_filter_as_dict(default_filter) or {}
     user_filter = metadata_filter_as_dict(user_filter) or {}
 
@@ -123,20 +151,17 @@ def filter_metadata(metadata, user_filter, default_filter=''):
     # notebook default filter = include only few metadata
     if default_exclude == 'all':
         if user_include == 'all':
-            return subset_metadata(metadata, exclude=user_exclude)
+            return None, user_exclude
         if user_exclude == 'all':
-            return subset_metadata(metadata, keep_only=user_include)
-        return subset_metadata(metadata,
-                               keep_only=set(user_include).union(default_include),
-                               exclude=user_exclude)
+            return user_include, None
+        return set(user_include).union(default_include), user_exclude
 
     # cell default filter = all metadata but removed ones
     if user_include == 'all':
-        return subset_metadata(metadata, exclude=user_exclude)
+        return None, user_exclude
     if user_exclude == 'all':
-        return subset_metadata(metadata, keep_only=user_include)
-    return subset_metadata(metadata,
-                           exclude=set(user_exclude).union(set(default_exclude).difference(user_include)))
+        return user_include, None
+    return None, set(user_exclude).union(set(default_exclude).difference(user_include))
 
 
 def second_level(keys):
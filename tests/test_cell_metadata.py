@@ -68,6 +68,12 @@ def test_ignore_metadata():
     assert metadata_to_rmd_options('R', metadata) == 'r echo=FALSE'
 
 
+def test_empty_metadata_to_rmd_options():
+    assert metadata_to_rmd_options('R', {}) == 'r'
+    assert metadata_to_rmd_options('python', {}, use_runtools=True) == 'python'
+    assert metadata_to_rmd_options(None, {}) == ''
+
+
 def test_filter_metadata():
     assert filter_metadata({'scrolled': True}, None, _IGNORE_CELL_METADATA) == {}
 
@@ -98,6 +104,12 @@ def test_only_metadata_2(text='key="value"', value=('', {'key': 'value'})):
     assert metadata_to_text(*value) == text
 
 
+def test_empty_metadata_to_text():
+    assert metadata_to_text('python', {}) == 'python'
+    assert metadata_to_text(None, {}) == ''
+    assert metadata_to_text({}) == ''
+
+
 def test_no_language(text='.class', value=('', {'.class': None})):
     compare(text_to_metadata(text), value)
     assert metadata_to_text(*value) == text
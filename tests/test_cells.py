@@ -1,7 +1,9 @@
-from nbformat.v4.nbbase import new_markdown_cell
+from nbformat.v4.nbbase import new_notebook, new_code_cell, new_markdown_cell, new_raw_cell
+import jupytext
 from jupytext.cell_reader import RMarkdownCellReader, LightScriptCellReader, \
     uncomment
-from jupytext.cell_to_text import RMarkdownCellExporter
+from jupytext.cell_to_text import RMarkdownCellExporter, cell_source, endofcell_marker
+from jupytext.languages import comment_lines
 
 
 def test_uncomment():
@@ -151,3 +153,35 @@ def test_code_to_cell():
     assert cell.source == '''def f(x):\n    return x+1'''
     assert cell.metadata == {}
     assert pos == 2
+
+
+def test_endofcell_marker():
+    assert endofcell_marker(['1 + 1', '', '2 + 2'], '#') == '-'
+    assert endofcell_marker(['1 + 1', '# -', '# ---'], '#') == '--'
+    assert endofcell_marker(['1 + 1', '# -', '# --  '], '#') == '---'
+    assert endofcell_marker(['1 + 1', '// -'], '//') == '--'
+    assert endofcell_marker(['1 + 1', '// -'], '#') == '-'
+
+
+def test_comment_lines():
+    assert comment_lines(['line one', '', 'line three', ''], '#') == ['# line one', '#', '# line three', '#']
+    assert comment_lines(['', 'code'], "#'") == ["#'", "#' code"]
+    assert comment_lines([], '//') == []
+    assert comment_lines(['text'], '') == ['text']
+
+
+def test_endofcell_marker_ignores_lines_inside_triple_quoted_cells():
+    assert endofcell_marker(['"""\n# -', "'''", '#+ echo\n"""'], '#') == '-'
+
+    cell = new_raw_cell("# -\n'''\n#+ echo", metadata={'cell_marker': '"""'})
+    py = jupytext.writes(new_notebook(cells=[cell]), 'py:light')
+    assert py.endswith('# + active=""\n"""\n# -\n\'\'\'\n#+ echo\n"""\n')
+    nb = jupytext.reads(py, 'py:light')
+    assert nb.cells[0].source == cell.source
+
+
+def test_cell_source_with_windows_line_endings():
+    assert cell_source(new_code_cell('a = 1\r\nb = 2')) == ['a = 1', 'b = 2']
+    assert cell_source(new_code_cell('a = 1\r\n')) == ['a = 1', '']
+    py = jupytext.writes(new_notebook(cells=[new_code_cell('a = 1\r\nb = 2')]), 'py:light')
+    assert '\r' not in py
@@ -97,3 +97,20 @@ def test_filter_nested_metadata():
 
     # That one is not supported yet
     # assert filter_metadata(metadata, 'I.1.a', '-I') == {'I': {'1': {'a': 1}}}
+
+
+def test_filter_metadata_same_result_with_string_or_dict_filters():
+    metadata = to_dict(['technical', 'user', 'preserve'])
+    for _ in range(2):
+        assert filter_metadata(metadata, 'all,-user', '-technical') == to_dict(['technical', 'preserve'])
+        assert filter_metadata(metadata, {'additional': 'all', 'excluded': ['user']},
+                               {'excluded': ['technical']}) == to_dict(['technical', 'preserve'])
+        assert filter_metadata(metadata, 'user', 'preserve,-all') == to_dict(['user', 'preserve'])
+    assert metadata == to_dict(['technical', 'user', 'preserve'])
+
+
+def test_filter_metadata_does_not_cache_unhashable_filters():
+    with pytest.raises(AttributeError):
+        metadata_filter_as_dict(['user'])
+    with pytest.raises(AttributeError):
+        filter_metadata(to_dict(['user']), ['user'])